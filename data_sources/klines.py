@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+class Klines:
+    """Structure-of-arrays container for candle data.
+
+    Holds one NumPy column per field (int64 ts, float32 open/high/low/
+    close/volume) instead of a list of per-candle dicts, so indicator code
+    can work on contiguous arrays directly. Iteration and indexing still
+    yield per-candle dicts for callers that expect the old list-of-dicts
+    format.
+    """
+
+    __slots__ = ('ts', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, ts: np.ndarray, open: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        self.ts = ts
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_raw(cls, data: list) -> 'Klines':
+        """Build a Klines from the raw exchange response (list of rows)."""
+        if not data:
+            empty = np.empty(0, dtype=np.float32)
+            return cls(np.empty(0, dtype=np.int64), empty, empty, empty, empty, empty)
+        # Разбираем ответ одним массивом вместо цикла по словарям;
+        # float32 хватает для цен с запасом, а SIMD-редукции обрабатывают
+        # вдвое больше элементов на регистр
+        arr = np.asarray(data, dtype=object)
+        ts = arr[:, 0].astype(np.int64)
+        ohlcv = arr[:, 1:6].astype(np.float32)
+        return cls(ts, *(np.ascontiguousarray(ohlcv[:, i]) for i in range(5)))
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __bool__(self) -> bool:
+        return len(self.ts) > 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Klines(self.ts[i], self.open[i], self.high[i],
+                          self.low[i], self.close[i], self.volume[i])
+        return {
+            'timestamp': int(self.ts[i]),
+            'open': float(self.open[i]),
+            'high': float(self.high[i]),
+            'low': float(self.low[i]),
+            'close': float(self.close[i]),
+            'volume': float(self.volume[i])
+        }
+
+    def __iter__(self):
+        for i in range(len(self.ts)):
+            yield self[i]
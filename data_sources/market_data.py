@@ -61,7 +61,7 @@ class MarketData:
         for timeframe in self._supported_timeframes_list:
             try:
                 klines = await self.exchanges[exchange_name].get_klines(symbol, timeframe, 1)
-                if klines and isinstance(klines, list) and len(klines) > 0:
+                if klines and len(klines) > 0:
                     supported.append(timeframe)
                     logger.info(f"Timeframe {timeframe} is supported on {exchange_name}")
             except Exception as e:
@@ -3,17 +3,62 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import aiohttp
+import asyncio
+import io
+import threading
 import time
+import zstandard as zstd
 import hmac
-import hashlib
-import pickle
+import numpy as np
+import orjson
 import os.path
+from pathlib import Path
+from collections import OrderedDict
 from urllib.parse import urlencode
 from utils.logging_setup import setup_logging
+from .klines import Klines
 from dotenv import load_dotenv
 
 logger = setup_logging('mexc_api')
 
+# TTL кэша (in-memory и дискового) по таймфреймам (секунды)
+_CACHE_TTL = {'1m': 60, '5m': 300, '15m': 900, '30m': 1800, '1h': 3600,
+              '4h': 14400, '8h': 28800, '1d': 86400, '1M': 2592000}
+_CACHE_DEFAULT_TTL = 300
+_MEM_CACHE_MAX_ENTRIES = 1024
+
+# Контексты zstd переиспользуем, но их нельзя трогать из нескольких потоков
+# одновременно — держим по паре на worker-поток
+_zstd_local = threading.local()
+
+def _zstd_ctx() -> tuple:
+    """Return (compressor, decompressor) owned by the current thread."""
+    try:
+        return _zstd_local.compressor, _zstd_local.decompressor
+    except AttributeError:
+        _zstd_local.compressor = zstd.ZstdCompressor(level=3)
+        _zstd_local.decompressor = zstd.ZstdDecompressor()
+        return _zstd_local.compressor, _zstd_local.decompressor
+
+def _load_cache(cache_file: str, ttl: float) -> Klines:
+    """Load cached klines from disk if still fresh (runs in a worker thread)."""
+    # Файл старше TTL таймфрейма — это тот же промах, что и отсутствие файла
+    if time.time() - os.path.getmtime(cache_file) >= ttl:
+        raise FileNotFoundError(f"{cache_file} is older than {ttl}s")
+    with open(cache_file, 'rb') as f:
+        raw = _zstd_ctx()[1].decompress(f.read())
+    with np.load(io.BytesIO(raw)) as data:
+        return Klines(data['ts'], data['open'], data['high'],
+                      data['low'], data['close'], data['volume'])
+
+def _save_cache(cache_file: str, klines: Klines) -> None:
+    """Save klines to the disk cache (runs in a worker thread)."""
+    buf = io.BytesIO()
+    np.savez(buf, ts=klines.ts, open=klines.open, high=klines.high,
+             low=klines.low, close=klines.close, volume=klines.volume)
+    with open(cache_file, 'wb') as f:
+        f.write(_zstd_ctx()[0].compress(buf.getvalue()))
+
 class MEXCAPI:
     def __init__(self, market_state: dict = None):
         self.market_state = market_state
@@ -23,10 +68,36 @@ class MEXCAPI:
         if not self.api_key or not self.api_secret:
             logger.error("MEXC API keys not found in .env file")
             raise ValueError("MEXC API keys not found")
+        # Кодируем секрет один раз, подпись идёт через C-реализацию hmac.digest
+        self._api_secret_bytes = self.api_secret.encode('utf-8')
         self.base_url = "https://api.mexc.com"
         self.cache_dir = "/root/trading_bot/cache/mexc_klines"
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
+        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+        self._session: aiohttp.ClientSession = None
+        self._mem_cache: OrderedDict = OrderedDict()
+        self._inflight: dict = {}
+
+    def _mem_cache_put(self, key: tuple, klines: Klines) -> None:
+        """Store decoded klines in the in-memory LRU cache."""
+        self._mem_cache[key] = (time.monotonic(), klines)
+        self._mem_cache.move_to_end(key)
+        while len(self._mem_cache) > _MEM_CACHE_MAX_ENTRIES:
+            self._mem_cache.popitem(last=False)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared client session, creating it on first use."""
+        # Переиспользуем одну сессию, чтобы не делать TCP+TLS handshake на каждый запрос
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(total=30)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the shared client session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            self._session = None
 
     def _sign_request(self, params: dict) -> dict:
         """Sign the request with API key and secret."""
@@ -34,42 +105,77 @@ class MEXCAPI:
         params['timestamp'] = timestamp
         params['api_key'] = self.api_key
 
-        query_string = urlencode(sorted(params.items()))
-        signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        params['signature'] = signature
+        # MEXC подписывает строку запроса как есть — сортировка ключей не нужна
+        query_string = urlencode(params.items())
+        params['signature'] = self._sign_query(query_string)
         return params
 
+    def _sign_query(self, query_string: str) -> str:
+        """Sign a ready-made canonical query string."""
+        return hmac.digest(self._api_secret_bytes, query_string.encode('utf-8'), 'sha256').hex()
+
     async def get_symbols(self) -> list:
         """Fetch all trading symbols from MEXC."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/api/v3/exchangeInfo") as response:
-                    data = await response.json()
-                    symbols = [symbol['symbol'] for symbol in data['symbols'] if symbol['status'] == '1']
-                    logger.info(f"Fetched {len(symbols)} symbols from MEXC")
-                    return symbols
+            session = await self._get_session()
+            async with session.get(f"{self.base_url}/api/v3/exchangeInfo") as response:
+                data = orjson.loads(await response.read())
+                symbols = [symbol['symbol'] for symbol in data['symbols'] if symbol['status'] == '1']
+                logger.info(f"Fetched {len(symbols)} symbols from MEXC")
+                return symbols
         except Exception as e:
             logger.error(f"Failed to fetch symbols from MEXC: {str(e)}")
             return []
 
-    async def get_klines(self, symbol: str, timeframe: str, limit: int) -> list:
+    async def get_klines(self, symbol: str, timeframe: str, limit: int) -> Klines:
         """Fetch historical klines for a symbol with caching."""
-        # Формируем путь к файлу кэша
-        cache_file = os.path.join(self.cache_dir, f"{symbol}_{timeframe}_{limit}.pkl")
-        
-        # Проверяем, есть ли данные в кэше
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'rb') as f:
-                    klines = pickle.load(f)
-                logger.info(f"Loaded {len(klines)} klines for {symbol} from cache")
-                return klines
-            except Exception as e:
-                logger.warning(f"Failed to load cache for {symbol}: {str(e)}, fetching from API")
+        # Сначала проверяем in-memory кэш — повторный запрос того же символа
+        # в пределах TTL обходится в один dict lookup
+        key = (symbol, timeframe, limit)
+        entry = self._mem_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < _CACHE_TTL.get(timeframe, _CACHE_DEFAULT_TTL):
+            self._mem_cache.move_to_end(key)
+            return entry[1]
+
+        # Если тот же запрос уже в полёте, ждём его результат вместо второго обращения к API
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await inflight
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            klines = await self._fetch_klines(key, symbol, timeframe, limit)
+            future.set_result(klines)
+            return klines
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            # Если владелец отменён (CancelledError не ловится выше), Future
+            # остался бы нерешённым и подвесил всех ожидающих — отменяем его
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+
+    async def _fetch_klines(self, key: tuple, symbol: str, timeframe: str, limit: int) -> Klines:
+        """Load klines from the disk cache or the API (single in-flight caller)."""
+        # Формируем путь к файлу кэша (суффикс версии инвалидирует старые pickle-файлы)
+        cache_file = os.path.join(self.cache_dir, f"{symbol}_{timeframe}_{limit}_v3.npz.zst")
+
+        # Пробуем кэш сразу (EAFP) — без лишнего stat-сисколла на os.path.exists;
+        # читаем в worker-потоке, чтобы не блокировать event loop
+        try:
+            ttl = _CACHE_TTL.get(timeframe, _CACHE_DEFAULT_TTL)
+            klines = await asyncio.to_thread(_load_cache, cache_file, ttl)
+            self._mem_cache_put(key, klines)
+            logger.info(f"Loaded {len(klines)} klines for {symbol} from cache")
+            return klines
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to load cache for {symbol}: {str(e)}, fetching from API")
 
         # Если кэша нет или он повреждён, делаем запрос к API
         try:
@@ -78,56 +184,49 @@ class MEXCAPI:
                 'interval': timeframe,
                 'limit': limit
             }
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/api/v3/klines", params=params) as response:
-                    data = await response.json()
-                    klines = [
-                        {
-                            'timestamp': int(kline[0]),
-                            'open': float(kline[1]),
-                            'high': float(kline[2]),
-                            'low': float(kline[3]),
-                            'close': float(kline[4]),
-                            'volume': float(kline[5])
-                        }
-                        for kline in data
-                    ]
-                    logger.info(f"Fetched {len(klines)} klines for {symbol} from MEXC")
-                    
-                    # Сохраняем данные в кэш
-                    try:
-                        with open(cache_file, 'wb') as f:
-                            pickle.dump(klines, f)
-                        logger.info(f"Saved {len(klines)} klines for {symbol} to cache")
-                    except Exception as e:
-                        logger.warning(f"Failed to save cache for {symbol}: {str(e)}")
-                    
-                    return klines
+            session = await self._get_session()
+            async with session.get(f"{self.base_url}/api/v3/klines", params=params) as response:
+                # orjson заметно быстрее stdlib json на больших массивах klines
+                data = orjson.loads(await response.read())
+                klines = Klines.from_raw(data)
+                self._mem_cache_put(key, klines)
+                logger.info(f"Fetched {len(klines)} klines for {symbol} from MEXC")
+
+                # Сохраняем данные в кэш
+                try:
+                    await asyncio.to_thread(_save_cache, cache_file, klines)
+                    logger.info(f"Saved {len(klines)} klines for {symbol} to cache")
+                except Exception as e:
+                    logger.warning(f"Failed to save cache for {symbol}: {str(e)}")
+
+                return klines
         except Exception as e:
             logger.error(f"Failed to fetch klines for {symbol}: {str(e)}")
-            return []
+            return Klines.from_raw([])
 
     async def place_order(self, symbol: str, side: str, quantity: float) -> dict:
         """Place a market order on MEXC."""
         try:
-            params = {
-                'symbol': symbol,
-                'side': side.upper(),
-                'type': 'MARKET',
-                'quantity': quantity,
-                'recvWindow': 5000
-            }
-            params = self._sign_request(params)
+            # Фиксированный набор параметров без небезопасных символов —
+            # собираем каноническую строку напрямую, без sort + urlencode
+            timestamp = int(time.time() * 1000)
+            query_string = (
+                f"symbol={symbol}&side={side.upper()}&type=MARKET"
+                f"&quantity={quantity}&recvWindow=5000"
+                f"&timestamp={timestamp}&api_key={self.api_key}"
+            )
+            signature = self._sign_query(query_string)
+            url = f"{self.base_url}/api/v3/order?{query_string}&signature={signature}"
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f"{self.base_url}/api/v3/order", params=params) as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to place order: {await response.text()}")
-                        return {}
+            session = await self._get_session()
+            async with session.post(url) as response:
+                if response.status != 200:
+                    logger.error(f"Failed to place order: {await response.text()}")
+                    return {}
 
-                    result = await response.json()
-                    logger.info(f"Placed {side} order for {symbol}: {result}")
-                    return result
+                result = orjson.loads(await response.read())
+                logger.info(f"Placed {side} order for {symbol}: {result}")
+                return result
         except Exception as e:
             logger.error(f"Failed to place order for {symbol}: {str(e)}")
             return {}
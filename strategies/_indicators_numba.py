@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from numba import njit
+
+@njit(cache=True, fastmath=True)
+def rsi_adx(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+            rsi_period: int, adx_period: int):
+    """Fused single-pass RSI + ADX kernel over SoA kline columns.
+
+    Returns (rsi, adx) for the last bar, matching the lfilter-based
+    calculate_rsi/calculate_adx without materializing intermediate arrays.
+    """
+    n = close.shape[0]
+
+    # --- RSI (сглаживание Уайлдера) ---
+    rsi = 50.0
+    if n >= rsi_period + 1:
+        avg_gain = 0.0
+        avg_loss = 0.0
+        for i in range(1, rsi_period + 1):
+            delta = close[i] - close[i - 1]
+            if delta > 0.0:
+                avg_gain += delta
+            else:
+                avg_loss -= delta
+        avg_gain /= rsi_period
+        avg_loss /= rsi_period
+        if avg_loss > 0.0:
+            for i in range(rsi_period + 1, n):
+                delta = close[i] - close[i - 1]
+                gain = delta if delta > 0.0 else 0.0
+                loss = -delta if delta < 0.0 else 0.0
+                avg_gain = (avg_gain * (rsi_period - 1) + gain) / rsi_period
+                avg_loss = (avg_loss * (rsi_period - 1) + loss) / rsi_period
+        if avg_loss == 0.0:
+            rsi = 100.0 if avg_gain > 0.0 else 50.0
+        else:
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    # --- ADX ---
+    adx = 0.0
+    if n >= adx_period + 1:
+        atr = 0.0
+        splus = 0.0
+        sminus = 0.0
+        for i in range(1, adx_period + 1):
+            tr = high[i] - low[i]
+            hc = abs(high[i] - close[i - 1])
+            if hc > tr:
+                tr = hc
+            lc = abs(low[i] - close[i - 1])
+            if lc > tr:
+                tr = lc
+            atr += tr
+            up = high[i] - high[i - 1]
+            dn = low[i - 1] - low[i]
+            if up > dn and up > 0.0:
+                splus += up
+            elif dn > up and dn > 0.0:
+                sminus += dn
+        atr /= adx_period
+        splus /= adx_period
+        sminus /= adx_period
+
+        # Кольцевой буфер последних adx_period значений DX
+        dx_ring = np.empty(adx_period, dtype=np.float64)
+        dx_count = 0
+
+        a = atr if atr > 1e-10 else 1e-10
+        plus_di = 100.0 * splus / a
+        minus_di = 100.0 * sminus / a
+        denom = plus_di + minus_di
+        if denom < 1e-10:
+            denom = 1e-10
+        dx_ring[0] = 100.0 * abs(plus_di - minus_di) / denom
+        dx_count = 1
+
+        for i in range(adx_period + 1, n):
+            tr = high[i] - low[i]
+            hc = abs(high[i] - close[i - 1])
+            if hc > tr:
+                tr = hc
+            lc = abs(low[i] - close[i - 1])
+            if lc > tr:
+                tr = lc
+            up = high[i] - high[i - 1]
+            dn = low[i - 1] - low[i]
+            plus_dm = up if (up > dn and up > 0.0) else 0.0
+            minus_dm = dn if (dn > up and dn > 0.0) else 0.0
+
+            atr = (atr * (adx_period - 1) + tr) / adx_period
+            splus = (splus * (adx_period - 1) + plus_dm) / adx_period
+            sminus = (sminus * (adx_period - 1) + minus_dm) / adx_period
+
+            a = atr if atr > 1e-10 else 1e-10
+            plus_di = 100.0 * splus / a
+            minus_di = 100.0 * sminus / a
+            denom = plus_di + minus_di
+            if denom < 1e-10:
+                denom = 1e-10
+            dx_ring[dx_count % adx_period] = 100.0 * abs(plus_di - minus_di) / denom
+            dx_count += 1
+
+        tail = adx_period if dx_count > adx_period else dx_count
+        total = 0.0
+        for i in range(tail):
+            total += dx_ring[i]
+        adx = total / tail
+
+    return rsi, adx
+
+# Прогреваем JIT-кэш при импорте, чтобы первая сделка не платила за компиляцию:
+# float32 — рабочий dtype SoA-колонок, float64 — на случай старых кэш-файлов
+_warm32 = np.zeros(2, dtype=np.float32)
+rsi_adx(_warm32, _warm32, _warm32, 14, 14)
+_warm64 = np.zeros(2, dtype=np.float64)
+rsi_adx(_warm64, _warm64, _warm64, 14, 14)
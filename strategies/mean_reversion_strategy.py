@@ -5,6 +5,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import asyncio
 import numpy as np
 from utils.logging_setup import setup_logging
+from data_sources.klines import Klines
 from .strategy import Strategy
 
 logger = setup_logging('mean_reversion_strategy')
@@ -23,11 +24,15 @@ class MeanReversionStrategy(Strategy):
                 logger.warning(f"Not enough data for {symbol} to calculate mean reversion")
                 return "hold"
 
-            close_prices = [kline['close'] for kline in klines]
-            close_array = np.array(close_prices[-self.window:])
+            if isinstance(klines, Klines):
+                close_prices = klines.close
+            else:
+                close_prices = np.asarray([kline['close'] for kline in klines], dtype=np.float64)
+            # Срез SoA-колонки уже contiguous float32 — редукции идут через SIMD
+            close_array = close_prices[-self.window:]
 
-            mean = np.mean(close_array)
-            std = np.std(close_array)
+            mean = close_array.mean()
+            std = close_array.std()
             upper_bound = mean + self.std_multiplier * std
             lower_bound = mean - self.std_multiplier * std
             current_price = close_prices[-1]
@@ -2,12 +2,30 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import asyncio
 import numpy as np
+from scipy.signal import lfilter
 from utils.logging_setup import setup_logging
+from data_sources.klines import Klines
 from .strategy import Strategy
 
+try:
+    from ._indicators_numba import rsi_adx
+except ImportError:
+    rsi_adx = None
+
 logger = setup_logging('rsi_strategy')
 
+def _wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing of a full series via lfilter (seeded with the first-period mean)."""
+    seed = values[:period].mean()
+    if len(values) <= period:
+        return np.array([seed])
+    b = [1.0 / period]
+    a = [1.0, -(period - 1) / period]
+    rest, _ = lfilter(b, a, values[period:], zi=[seed * (period - 1) / period])
+    return np.concatenate(([seed], rest))
+
 class RSIStrategy(Strategy):
     def __init__(self, market_state: dict, market_data):
         super().__init__(market_state, market_data)
@@ -20,8 +38,8 @@ class RSIStrategy(Strategy):
             return 50.0
 
         deltas = np.diff(closes)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
+        gains = np.maximum(deltas, 0.0)
+        losses = np.maximum(-deltas, 0.0)
 
         avg_gain = np.mean(gains[:period])
         avg_loss = np.mean(losses[:period])
@@ -29,82 +47,64 @@ class RSIStrategy(Strategy):
         if avg_loss == 0:
             return 100.0 if avg_gain > 0 else 50.0
 
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        if len(gains) > period:
+            # Сглаживание Уайлдера — БИХ-фильтр первого порядка,
+            # считаем одним вызовом lfilter вместо питоновского цикла
+            b = [1.0 / period]
+            a = [1.0, -(period - 1) / period]
+            zi_scale = (period - 1) / period
+            avg_gain = lfilter(b, a, gains[period:], zi=[avg_gain * zi_scale])[0][-1]
+            avg_loss = lfilter(b, a, losses[period:], zi=[avg_loss * zi_scale])[0][-1]
 
-        for i in range(period, len(gains)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-            if avg_loss == 0:
-                rsi = 100.0 if avg_gain > 0 else 50.0
-            else:
-                rs = avg_gain / avg_loss
-                rsi = 100 - (100 / (1 + rs))
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
 
-        return rsi
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
 
-    def calculate_adx(self, klines: list, period: int = 14) -> float:
+    def calculate_adx(self, klines, period: int = 14) -> float:
         """Calculate ADX (Average Directional Index) for the given klines."""
         if len(klines) < period + 1:
             return 0.0
 
-        tr_values = []
-        plus_dm = []
-        minus_dm = []
-
-        for i in range(1, len(klines)):
-            high = klines[i]['high']
-            low = klines[i]['low']
-            prev_high = klines[i-1]['high']
-            prev_low = klines[i-1]['low']
-            prev_close = klines[i-1]['close']
-
-            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            tr_values.append(tr)
-
-            up_move = high - prev_high
-            down_move = prev_low - low
-            plus = up_move if up_move > down_move and up_move > 0 else 0
-            minus = down_move if down_move > up_move and down_move > 0 else 0
-            plus_dm.append(plus)
-            minus_dm.append(minus)
-
-        if len(tr_values) < period:
-            return 0.0
-
-        atr = np.mean(tr_values[:period])
-        atr = max(atr, 1e-10)
-        plus_di = 100 * np.mean(plus_dm[:period]) / atr
-        minus_di = 100 * np.mean(minus_dm[:period]) / atr
-        plus_di = np.clip(plus_di, -1e5, 1e5)
-        minus_di = np.clip(minus_di, -1e5, 1e5)
-        if plus_di + minus_di == 0:
-            dx = 0
+        if isinstance(klines, Klines):
+            high, low, close = klines.high, klines.low, klines.close
         else:
-            dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-
-        adx_values = [dx]
-        for i in range(period, len(tr_values)):
-            atr = (atr * (period - 1) + tr_values[i]) / period
-            atr = max(atr, 1e-10)
-            prev_plus_di = plus_di
-            prev_minus_di = minus_di
-            plus_di = (prev_plus_di * (period - 1) + plus_dm[i]) / period
-            minus_di = (prev_minus_di * (period - 1) + minus_dm[i]) / period
-            plus_di = 100 * plus_di / atr
-            minus_di = 100 * minus_di / atr
-            plus_di = np.clip(plus_di, -1e5, 1e5)
-            minus_di = np.clip(minus_di, -1e5, 1e5)
-            if plus_di + minus_di == 0:
-                dx = 0
-            else:
-                dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-            adx_values.append(dx)
-
-        adx = np.mean(adx_values[-period:]) if adx_values else 0.0
+            high = np.array([kline['high'] for kline in klines])
+            low = np.array([kline['low'] for kline in klines])
+            close = np.array([kline['close'] for kline in klines])
+
+        # True range и directional movement по всем барам сразу
+        tr = np.maximum.reduce([high[1:] - low[1:],
+                                np.abs(high[1:] - close[:-1]),
+                                np.abs(low[1:] - close[:-1])])
+        up = high[1:] - high[:-1]
+        dn = low[:-1] - low[1:]
+        plus_dm = np.where((up > dn) & (up > 0), up, 0.0)
+        minus_dm = np.where((dn > up) & (dn > 0), dn, 0.0)
+
+        atr = np.maximum(_wilder_smooth(tr, period), 1e-10)
+        plus_di = 100 * _wilder_smooth(plus_dm, period) / atr
+        minus_di = 100 * _wilder_smooth(minus_dm, period) / atr
+        dx = 100 * np.abs(plus_di - minus_di) / np.maximum(plus_di + minus_di, 1e-10)
+
+        adx = dx[-period:].mean()
         if np.isnan(adx):
             adx = 0.0
-        return adx
+        return float(adx)
+
+    async def scan_symbols(self, symbols: list, timeframe: str, limit: int, exchange_name: str, predictions=None, volatility=None) -> list:
+        """Generate signals for many symbols concurrently, bounded by a semaphore."""
+        # Ограничение в пару к limit_per_host общей aiohttp-сессии MEXCAPI
+        semaphore = asyncio.Semaphore(20)
+
+        async def scan_one(symbol: str):
+            async with semaphore:
+                signal = await self.generate_signal(symbol, timeframe, limit, exchange_name,
+                                                    predictions=predictions, volatility=volatility)
+                return symbol, signal
+
+        return await asyncio.gather(*(scan_one(symbol) for symbol in symbols))
 
     async def generate_signal(self, symbol: str, timeframe: str, limit: int, exchange_name: str, predictions=None, volatility=None) -> str:
         """Generate a trading signal using adaptive RSI with dynamic thresholds."""
@@ -114,28 +114,34 @@ class RSIStrategy(Strategy):
                 logger.warning(f"No klines data for {symbol}, returning hold signal")
                 return 'hold'
 
-            closes = np.array([kline['close'] for kline in klines])
+            if isinstance(klines, Klines):
+                closes = klines.close
+            else:
+                closes = np.array([kline['close'] for kline in klines])
             if len(closes) < self.base_period + 1:
                 logger.warning(f"Not enough data for {symbol}, returning hold signal")
                 return 'hold'
 
+            # volatility=None раньше ронял расчёт порогов в TypeError
+            vol = 0.0 if volatility is None else float(volatility)
+
             period = self.base_period
             if volatility is not None:
-                period = int(self.base_period * (1 - volatility))
+                period = int(self.base_period * (1 - vol))
                 period = max(5, min(20, period))
                 logger.info(f"Adjusted RSI period for {symbol}: {period}")
 
-            rsi = self.calculate_rsi(closes, period)
-            adx = self.calculate_adx(klines, period=14)
-
-            # Динамические пороги на основе RSI и ADX
-            overbought_threshold = 70 - (volatility * 10)  # Уменьшаем порог при высокой волатильности
-            oversold_threshold = 30 + (volatility * 10)   # Увеличиваем порог при высокой волатильности
-            adx_threshold = 15 + (volatility * 10)        # Динамический порог для ADX
+            if rsi_adx is not None and isinstance(klines, Klines):
+                # Одно слитое numba-ядро вместо двух проходов по массивам
+                rsi, adx = rsi_adx(klines.high, klines.low, klines.close, period, 14)
+            else:
+                rsi = self.calculate_rsi(closes, period)
+                adx = self.calculate_adx(klines, period=14)
 
-            overbought_threshold = max(50, min(80, overbought_threshold))
-            oversold_threshold = max(20, min(50, oversold_threshold))
-            adx_threshold = max(10, min(30, adx_threshold))
+            # Динамические пороги на основе волатильности, зажатые одним np.clip
+            overbought_threshold, oversold_threshold, adx_threshold = np.clip(
+                [70 - vol * 10, 30 + vol * 10, 15 + vol * 10],
+                [50, 20, 10], [80, 50, 30])
 
             signal = 'hold'
             if rsi > overbought_threshold and adx > adx_threshold: